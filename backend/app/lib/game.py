@@ -1,11 +1,25 @@
-import random
-from typing import Dict, List, Optional
+from collections import Counter
+from typing import Dict, List, Optional, Set
 import asyncio
+import contextlib
+import logging
+import time
+
+from starlette.websockets import WebSocketState
 
 from ..models.player import Player
-from .utils import generate_deck
+from .utils import RNG, Card, card_from_dict, card_to_dict, generate_deck
+from .ws_json import encode, send_json
+
+logger = logging.getLogger(__name__)
 
 MAX_PLAYERS_PER_GAME = 4
+BROADCAST_SEND_TIMEOUT = 5  # Seconds a single player's send may take before their socket is closed
+READY_BROADCAST_DELAY = 0.05  # Seconds ready changes are collected before being announced
+
+_WILDS = frozenset({"+4", "rainbow"})
+_COLORS = frozenset({"pink", "orange", "lime", "blue"})
+_SKIP_VALUES = frozenset({"block", "reverse"})  # Cards after which the turn doesn't pass normally
 
 
 class Game:
@@ -13,36 +27,83 @@ class Game:
 
     def __init__(self, code: str):
         self.code = code
+        self.created_at = time.monotonic()
         self.players: List[Player] = []
+        self._by_id: Dict[str, Player] = {}
+        self._name_keys: Set[str] = set()
 
         self.started = False
 
-        self.deck: List[Dict] = []
-        self.discard_pile: List[Dict] = []
+        self.deck: List[Card] = []
+        # Only the top of the discard pile is ever inspected; the cards under
+        # it are stashed until they're reshuffled back into the deck
+        self.top_card: Optional[Card] = None
+        self.discard_stash: List[Card] = []
 
         self.order: 'GameOrder' = None
 
         self.colo_pending: Optional[Player] = None
         self.colo_task: Optional[asyncio.Task] = None
+        self._colo_lock = asyncio.Lock()
+
+        # Closes of stalled sockets still in flight; kept so they aren't garbage collected
+        self._close_tasks: Set[asyncio.Task] = set()
+
+        # Latest readiness change not yet announced
+        self._pending_ready: Optional[Player] = None
+        self._ready_broadcast_task: Optional[asyncio.Task] = None
 
     async def broadcast(self, message: dict):
         """Sends a message to all connected players in the game."""
-        disconnected_players = []
-        for player in self.players:
-            try:
-                await player.websocket.send_json(message)
-            except Exception:
-                disconnected_players.append(player)
-
-        for player in disconnected_players:
+        # Encode once and send the same text frame to everyone, concurrently,
+        # so one slow socket doesn't hold up the rest. A stalled socket is
+        # timed out and closed, which ends that player's connection handler.
+        payload = encode(message)
+        players = list(self.players)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(player.websocket.send_text(payload), BROADCAST_SEND_TIMEOUT)
+              for player in players),
+            return_exceptions=True
+        )
+
+        disconnected_players = [
+            (player, result) for player, result in zip(players, results)
+            if isinstance(result, Exception)
+        ]
+        for player, error in disconnected_players:
+            logger.warning("Failed to send to %s: %r", player.name, error)
             self.remove_player(player)
+            if isinstance(error, asyncio.TimeoutError):
+                # The socket may still be open, so close it rather than leave
+                # a player who can act but no longer hears about the game
+                task = asyncio.create_task(self._close_stalled(player))
+                self._close_tasks.add(task)
+                task.add_done_callback(self._close_tasks.discard)
+
+    async def _close_stalled(self, player: Player):
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(player.websocket.close(), BROADCAST_SEND_TIMEOUT)
 
     def add_player(self, player: Player):
         if not self.is_full():
+            self._by_id[player.id] = player
+            self._name_keys.add(player.name_key)
             self.players.append(player)
 
     def remove_player(self, player: Player):
-        self.players = [p for p in self.players if p.id != player.id]
+        if self._by_id.pop(player.id, None) is not None:
+            self._name_keys.discard(player.name_key)
+            self.players.remove(player)
+
+    def is_name_taken(self, name: str) -> bool:
+        """Checks case-insensitively whether a player in this game already uses the name."""
+        return name.casefold() in self._name_keys
+
+    def is_abandoned(self, max_age: float) -> bool:
+        """Whether the game is older than `max_age` seconds and has no live connections."""
+        if any(p.websocket.client_state != WebSocketState.DISCONNECTED for p in self.players):
+            return False
+        return time.monotonic() - self.created_at > max_age
 
     def is_full(self) -> bool:
         return len(self.players) >= MAX_PLAYERS_PER_GAME
@@ -50,15 +111,68 @@ class Game:
     def to_dict_list(self) -> List[dict]:
         return [p.to_dict() for p in self.players]
 
+    def hand_counts(self) -> Dict[str, int]:
+        return {p.id: p.card_count for p in self.players}
+
+    def _discard(self, card: Card):
+        """Puts a card on top of the discard pile."""
+        if self.top_card is not None:
+            self.discard_stash.append(self.top_card)
+        self.top_card = card
+
+    def set_ready(self, player: Player, is_ready: bool):
+        """
+        Updates a player's readiness. All changes arriving within
+        READY_BROADCAST_DELAY of the first one are announced in a single broadcast.
+        """
+        player.is_ready = is_ready
+        self._pending_ready = player
+        if self._ready_broadcast_task is None:
+            self._ready_broadcast_task = asyncio.create_task(
+                self._broadcast_ready_later())
+
+    async def _broadcast_ready_later(self):
+        await asyncio.sleep(READY_BROADCAST_DELAY)
+        self._ready_broadcast_task = None
+        await self._flush_ready_broadcast()
+
+    async def _flush_ready_broadcast(self):
+        """Announces pending readiness changes along with every player's current state."""
+        player, self._pending_ready = self._pending_ready, None
+        if player is None:
+            return
+        # player_id/is_ready describe the latest change; "players" covers
+        # everyone else who changed in the same window
+        await self.broadcast({
+            "status": "player_ready",
+            "player_id": player.id,
+            "is_ready": player.is_ready,
+            "players": self.to_dict_list()
+        })
+
     def _reshuffle_discard_pile(self):
         """Reshuffles the discard pile back into the deck, leaving the top card."""
-        if not self.discard_pile:
+        if not self.discard_stash:
             return
-        top_card = self.discard_pile.pop()
-        self.deck.extend(self.discard_pile)
-        random.shuffle(self.deck)
-        self.discard_pile = [top_card]
-        print("Reshuffled discard pile into deck.")
+        # Played wild cards go back into the deck without their chosen color
+        self.deck.extend(
+            (None, value) if value in _WILDS else (color, value)
+            for color, value in self.discard_stash
+        )
+        self.discard_stash.clear()
+        RNG.shuffle(self.deck)
+        logger.info("Reshuffled discard pile into deck in game %s.", self.code)
+
+    def _take_from_deck(self, count: int) -> List[Card]:
+        """Takes up to `count` cards off the top of the deck, reshuffling first if it runs short."""
+        if len(self.deck) < count:
+            self._reshuffle_discard_pile()
+        count = min(count, len(self.deck))
+        if count <= 0:
+            return []
+        cards = self.deck[-count:]
+        del self.deck[-count:]
+        return cards
 
     async def start_game(self):
         """Initializes the game state, deals cards, and notifies players."""
@@ -67,69 +181,76 @@ class Game:
         self.deck, hands = generate_deck(player_ids)
 
         for player in self.players:
-            player.hand = hands.get(player.id, [])
-
-        # Ensure the first card is not a wild card
+            player.hand = Counter(hands.get(player.id, []))
+
+        # Ensure the first card is not a wild card by swapping the topmost
+        # non-wild card to the top of the already shuffled deck
+        for i in range(len(self.deck) - 1, -1, -1):
+            if self.deck[i][1] not in _WILDS:
+                self.deck[i], self.deck[-1] = self.deck[-1], self.deck[i]
+                break
         first_card = self.deck.pop()
-        while first_card['value'] in ["+4", "rainbow"]:
-            self.deck.append(first_card)
-            random.shuffle(self.deck)
-            first_card = self.deck.pop()
 
-        self.discard_pile.append(first_card)
+        self._discard(first_card)
 
-        random.shuffle(self.players)
+        RNG.shuffle(self.players)
         self.order = GameOrder(self.players)
 
-        current_turn_player_id = self.order.get_current_player().id
+        # Everything except the hand is the same for every player, so build it once
+        common = {
+            "status": "game_started",
+            "top_card": card_to_dict(self.top_card),
+            "player_hands": self.hand_counts(),
+            "turn_order": [p.id for p in self.order.get_player_sequence()],
+            "current_turn": self.order.get_current_player().id
+        }
+
+        # Announce any ready changes still waiting on the timer before the game starts
+        if self._ready_broadcast_task:
+            self._ready_broadcast_task.cancel()
+            self._ready_broadcast_task = None
+        await self._flush_ready_broadcast()
 
         for player in self.players:
-            await player.websocket.send_json({
-                "status": "game_started",
-                "your_hand": player.hand,
-                "top_card": self.discard_pile[-1],
-                "player_hands": {p.id: len(p.hand) for p in self.players},
-                "turn_order": [p.id for p in self.order.get_player_sequence()],
-                "current_turn": current_turn_player_id
-            })
+            await send_json(player.websocket, {**common, "your_hand": player.hand_dicts})
 
     async def process_move(self, player: Player, move: dict):
         """Validates and processes a player's move."""
-        card_to_play = move.get("card")
-        if not card_to_play:
+        card_to_play = card_from_dict(move.get("card")) if isinstance(move, dict) else None
+        if card_to_play is None:
             return await player.send_error("Invalid move format.")
 
-        if card_to_play not in player.hand:
+        if not player.has_card(card_to_play):
             return await player.send_error("You don't have that card.")
 
-        top_card = self.discard_pile[-1]
-        is_wild = card_to_play['value'] in ['+4', 'rainbow']
+        color, value = card_to_play
+        top_color, top_value = self.top_card
+        is_wild = value in _WILDS
 
-        if not (card_to_play['color'] == top_card['color'] or card_to_play['value'] == top_card['value'] or is_wild):
+        if not (color == top_color or value == top_value or is_wild):
             return await player.send_error("Invalid card played.")
 
-        player.hand.remove(card_to_play)
-
+        played_card = card_to_play
         if is_wild:
             new_color = move.get("new_color")
-            if new_color not in ["pink", "orange", "lime", "blue"]:
-                player.hand.append(card_to_play)  # Return card to hand
+            if not isinstance(new_color, str) or new_color not in _COLORS:
                 return await player.send_error("A new color must be chosen for a wild card.")
-            card_to_play['color'] = new_color
+            played_card = (new_color, value)
 
-        self.discard_pile.append(card_to_play)
+        player.remove_card(card_to_play)
+        self._discard(played_card)
 
-        await self._handle_action_cards(card_to_play)
+        await self._handle_action_cards(played_card)
 
-        if card_to_play['value'] not in ['block', 'reverse']:
+        if value not in _SKIP_VALUES:
             self.order.next_turn()
 
         await self.broadcast({
             "status": "move_made",
             "player_id": player.id,
-            "card": card_to_play,
-            "player_hands": {p.id: len(p.hand) for p in self.players},
-            "top_card": self.discard_pile[-1],
+            "card": card_to_dict(played_card),
+            "player_hands": self.hand_counts(),
+            "top_card": card_to_dict(self.top_card),
             "current_turn": self.order.get_current_player().id
         })
 
@@ -137,9 +258,9 @@ class Game:
             await self.broadcast({"status": "game_over", "winner_id": player.id})
             self.started = False  # End game
 
-    async def _handle_action_cards(self, card: dict):
+    async def _handle_action_cards(self, card: Card):
         """Applies the effects of special action cards like +2, +4, block, or reverse."""
-        value = card['value']
+        value = card[1]
 
         if value == "+2":
             await self.draw_cards_for_next_player(2)
@@ -153,21 +274,15 @@ class Game:
     async def draw_cards_for_next_player(self, count: int):
         """Forces the next player in order to draw a specified number of cards."""
         target_player = self.order.get_next_player()
-        drawn_cards = []
-        for _ in range(count):
-            if not self.deck:
-                self._reshuffle_discard_pile()
-            if self.deck:  # Check again in case reshuffle yielded nothing
-                drawn_card = self.deck.pop()
-                target_player.hand.append(drawn_card)
-                drawn_cards.append(drawn_card)
+        drawn_cards = self._take_from_deck(count)
 
         if drawn_cards:
+            target_player.add_cards(drawn_cards)
             # Notify the targeted player of their new hand
-            await target_player.websocket.send_json({
+            await send_json(target_player.websocket, {
                 "status": "cards_drawn_for_you",
-                "new_cards": drawn_cards,
-                "your_hand": target_player.hand
+                "new_cards": [card_to_dict(c) for c in drawn_cards],
+                "your_hand": target_player.hand_dicts
             })
 
     async def draw_card(self, player: Player):
@@ -179,44 +294,51 @@ class Game:
             return await player.send_error("The deck is empty.")
 
         card = self.deck.pop()
-        player.hand.append(card)
+        player.add_cards([card])
 
         # Notify the player of their new card
-        await player.websocket.send_json({
+        await send_json(player.websocket, {
             "status": "card_drawn",
-            "new_card": card,
-            "your_hand": player.hand
+            "new_card": card_to_dict(card),
+            "your_hand": player.hand_dicts
         })
 
         # Notify all players of the hand count change
         await self.broadcast({
             "status": "hand_updated",
             "player_id": player.id,
-            "new_count": len(player.hand)
+            "new_count": player.card_count
         })
 
     async def start_colo_challenge(self, player: Player, broadcast_callback):
         """
         Called when a player has one card left to initiate the 'COLO' challenge.
         """
-        if self.colo_task:  # Cancel any existing challenge
-            self.colo_task.cancel()
+        async with self._colo_lock:
+            old_task = self.colo_task
+            if old_task:  # Cancel any existing challenge and let it finish unwinding
+                old_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await old_task
+
+            self.colo_pending = player
+            self.colo_task = asyncio.create_task(
+                self._colo_timeout(broadcast_callback))
 
-        self.colo_pending = player
         await broadcast_callback({
             "status": "colo_started",
             "target_player_id": player.id,
         })
 
-        self.colo_task = asyncio.create_task(
-            self._colo_timeout(broadcast_callback))
-
     async def _colo_timeout(self, broadcast_callback):
         try:
             await asyncio.sleep(5)  # 5 seconds to press "COLO"
             # Timeout occurred, no one pressed
-            self.colo_pending = None
-            self.colo_task = None
+            async with self._colo_lock:
+                if self.colo_task is not asyncio.current_task():
+                    return  # The challenge was resolved or replaced meanwhile
+                self.colo_pending = None
+                self.colo_task = None
             await broadcast_callback({
                 "status": "colo_timeout"
             })
@@ -228,37 +350,40 @@ class Game:
         Called when a player presses the 'COLO' button.
         If another player catches the one with 1 card — penalty applies.
         """
-        if self.colo_pending is None:
-            await player.websocket.send_json({
+        async with self._colo_lock:
+            target = self.colo_pending
+
+            # Reset the challenge before any awaits so repeated presses can't resolve it twice
+            if target is not None:
+                if self.colo_task:
+                    self.colo_task.cancel()
+                self.colo_task = None
+                self.colo_pending = None
+
+                if player is not target:
+                    penalty_cards = self._take_from_deck(2)
+                    target.add_cards(penalty_cards)
+
+        if target is None:
+            await send_json(player.websocket, {
                 "status": "colo_invalid_press",
                 "message": "There is no COLO challenge right now."
             })
             return
 
-        target = self.colo_pending
-
-        if player.id == target.id:
+        if player is target:
             # The player with 1 card pressed COLO — success!
-            await player.websocket.send_json({
+            await send_json(player.websocket, {
                 "status": "colo_success",
                 "message": "You successfully called COLO!"
             })
         else:
             # Someone else pressed COLO first — target player gets 2 penalty cards
-            penalty_cards = []
-            for _ in range(2):
-                if not self.deck:
-                    self._reshuffle_discard_pile()
-                if self.deck:
-                    card = self.deck.pop()
-                    target.hand.append(card)
-                    penalty_cards.append(card)
-
-            await target.websocket.send_json({
+            await send_json(target.websocket, {
                 "status": "colo_penalty",
                 "message": "Another player called COLO before you!",
-                "new_cards": penalty_cards,
-                "your_hand": target.hand
+                "new_cards": [card_to_dict(c) for c in penalty_cards],
+                "your_hand": target.hand_dicts
             })
 
             await broadcast_callback({
@@ -267,54 +392,37 @@ class Game:
                 "by_id": player.id
             })
 
-        # Reset challenge in all cases
-        if self.colo_task:
-            self.colo_task.cancel()
-        self.colo_task = None
-        self.colo_pending = None
-
 
 class GameOrder:
     """Manages the turn order of players in a circular fashion."""
-    class OrderNode:
-        def __init__(self, player: Player):
-            self.player = player
-            self.next: 'GameOrder.OrderNode' = None
-            self.prev: 'GameOrder.OrderNode' = None
 
     def __init__(self, players: List[Player]):
         if not players:
             raise ValueError("Cannot create a game order with no players.")
 
-        self.nodes = [self.OrderNode(p) for p in players]
-        num_players = len(self.nodes)
+        self.players_arr: List[Player] = list(players)
+        self.size = len(self.players_arr)
 
-        for i in range(num_players):
-            self.nodes[i].next = self.nodes[(i + 1) % num_players]
-            self.nodes[i].prev = self.nodes[(
-                i - 1 + num_players) % num_players]
+        self.cursor = 0
+        self.direction = 1  # 1 for normal play, -1 once reversed
 
-        self.current = self.nodes[0]
-        self.reversed = False
+    def step_from(self, index: int, steps: int) -> int:
+        """Returns the index `steps` seats away from `index` in the current direction of play."""
+        return (index + self.direction * steps) % self.size
 
     def get_current_player(self) -> Player:
-        return self.current.player
+        return self.players_arr[self.cursor]
 
     def get_next_player(self) -> Player:
         """Gets the next player without advancing the turn."""
-        return self.current.prev.player if self.reversed else self.current.next.player
+        return self.players_arr[self.step_from(self.cursor, 1)]
 
     def next_turn(self):
-        self.current = self.current.prev if self.reversed else self.current.next
+        self.cursor = self.step_from(self.cursor, 1)
 
     def reverse(self):
-        self.reversed = not self.reversed
+        self.direction = -self.direction
 
     def get_player_sequence(self) -> List[Player]:
         """Returns the players in the current turn order."""
-        sequence = []
-        node = self.current
-        for _ in range(len(self.nodes)):
-            sequence.append(node.player)
-            node = node.next
-        return sequence
+        return self.players_arr[self.cursor:] + self.players_arr[:self.cursor]
@@ -1,47 +1,86 @@
 import random
 import string
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+# A card is a (color, value) pair; wild cards have no color until played
+Card = Tuple[Optional[str], str]
 
-def generate_game_code(k: int = 5) -> str:
+# Shared random source for codes and shuffles; seed it here for reproducible games
+RNG = random.Random()
+
+_CODE_ALPHABET = string.ascii_uppercase + string.digits
+
+
+def generate_game_code(k: int = 5, _choices=RNG.choices, _alphabet: str = _CODE_ALPHABET) -> str:
     """Generates a random, uppercase, alphanumeric game code."""
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=k))
+    # The underscored defaults bind the RNG method and alphabet as fast locals
+    return "".join(_choices(_alphabet, k=k))
 
 
-def generate_deck(player_ids: List[str]) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
-    """Creates a shuffled deck of cards and deals them to players."""
+def card_to_dict(card: Card) -> Dict:
+    """Returns the JSON representation of a card sent to clients."""
+    return {"color": card[0], "value": card[1]}
+
+
+def card_from_dict(data: Any) -> Optional[Card]:
+    """
+    Converts a card received from a client into its internal form.
+    Returns None if the data isn't shaped like a card.
+    """
+    if not isinstance(data, dict):
+        return None
+    color = data.get("color")
+    value = data.get("value")
+    if not (color is None or isinstance(color, str)) or not isinstance(value, str):
+        return None
+    return (color, value)
+
+
+def _build_canonical_deck() -> Tuple[Card, ...]:
+    """Builds the full, unshuffled set of cards a game is played with."""
     colors = ["pink", "orange", "lime", "blue"]
     color_actions = ["block", "+2", "reverse"]
     wild_actions = ["+4", "rainbow"]
 
-    deck: List[Dict] = []
+    deck: List[Card] = []
 
     # Create colored cards
     for color in colors:
         # One '0' card per color
-        deck.append({"color": color, "value": "0"})
+        deck.append((color, "0"))
         # Two of every other number (1-9)
         for num in range(1, 10):
-            deck.append({"color": color, "value": str(num)})
-            deck.append({"color": color, "value": str(num)})
+            deck.append((color, str(num)))
+            deck.append((color, str(num)))
         # Two of each action card
         for action in color_actions:
-            deck.append({"color": color, "value": action})
-            deck.append({"color": color, "value": action})
+            deck.append((color, action))
+            deck.append((color, action))
 
     # Create wild cards
     for action in wild_actions:
         for _ in range(4):
             # Wild cards have no color initially
-            deck.append({"color": None, "value": action})
+            deck.append((None, action))
+
+    return tuple(deck)
+
 
-    random.shuffle(deck)
+# Cards are immutable tuples, so every game can start from the same template
+_CANONICAL_DECK = _build_canonical_deck()
+
+
+def generate_deck(player_ids: List[str]) -> Tuple[List[Card], Dict[str, List[Card]]]:
+    """Creates a shuffled deck of cards and deals them to players."""
+    deck = list(_CANONICAL_DECK)
+    RNG.shuffle(deck)
 
-    # Deal 7 cards to each player
-    hands: Dict[str, List[Dict]] = {player_id: [] for player_id in player_ids}
-    for _ in range(7):
-        for player_id in player_ids:
-            if deck:
-                hands[player_id].append(deck.pop())
+    # Deal 7 cards to each player. The deck is already shuffled, so handing out
+    # contiguous slices is as fair as dealing round-robin
+    hand_size = 7
+    hands: Dict[str, List[Card]] = {}
+    for player_id in player_ids:
+        hands[player_id] = deck[-hand_size:]
+        del deck[-hand_size:]
 
     return deck, hands
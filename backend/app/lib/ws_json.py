@@ -0,0 +1,19 @@
+from typing import Any
+
+import orjson
+from fastapi import WebSocket
+
+
+def encode(message: Any) -> str:
+    """Serializes a message into the JSON text sent over the socket."""
+    return orjson.dumps(message).decode()
+
+
+async def recv_json(websocket: WebSocket) -> Any:
+    """Receives a text frame and parses it as JSON."""
+    return orjson.loads(await websocket.receive_text())
+
+
+async def send_json(websocket: WebSocket, message: Any):
+    """Sends a message as a JSON text frame."""
+    await websocket.send_text(encode(message))
@@ -1,21 +1,77 @@
 import asyncio
-from typing import Dict, Union
+import contextlib
+import logging
+import os
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Union
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from .lib.game import Game
 from .lib.utils import generate_game_code
+from .lib.ws_json import recv_json, send_json
 from .models.player import Player
 
-app = FastAPI()
+# uvicorn only configures its own loggers, so give the app's a handler too
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(levelname)s:     %(name)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = 60  # Seconds between passes over the games registry
+ABANDONED_GAME_TTL = 300  # Seconds a game may sit without a live connection before it's dropped
+CODE_POOL_SIZE = 1024  # Game codes generated ahead of time for /create
+CODE_POOL_REFILL_INTERVAL = 1
+
+# Codes handed out by /create; kept topped up in the background so the
+# request path is a single popleft
+_unused_codes: Deque[str] = deque(maxlen=CODE_POOL_SIZE)
+
 
+async def _refill_codes():
+    while True:
+        while len(_unused_codes) < CODE_POOL_SIZE:
+            _unused_codes.append(generate_game_code())
+        await asyncio.sleep(CODE_POOL_REFILL_INTERVAL)
+
+
+async def _sweep_games():
+    """
+    Periodically removes games nobody is connected to, e.g. games that were
+    created but never joined, or whose handlers never got to clean up.
+    """
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        for code, game in list(games.items()):
+            if game.is_abandoned(ABANDONED_GAME_TTL):
+                games.pop(code, None)
+                logger.info("Game %s was abandoned and has been closed.", code)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = [
+        asyncio.create_task(_sweep_games()),
+        asyncio.create_task(_refill_codes()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Comma-separated list of allowed origins; defaults to any origin for development.
+# No cookies or auth headers are used, so credentials stay disabled (they're
+# invalid together with a wildcard origin anyway).
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 games: Dict[str, "Game"] = {}
@@ -27,12 +83,12 @@ async def create_game_http():
     HTTP endpoint to create a new game.
     Generates a unique code and initializes a Game instance.
     """
-    code = generate_game_code()
-    while code in games:
+    code = _unused_codes.popleft() if _unused_codes else generate_game_code()
+    while code in games:  # Rare, but pooled codes can still collide with live games
         code = generate_game_code()
 
     games[code] = Game(code)
-    print(f"New game created: {code}")
+    logger.info("New game created: %s", code)
     return {"success": True, "code": code}
 
 
@@ -47,6 +103,66 @@ async def check_code(code: str):
     return {"exists": False, "full": False}
 
 
+async def _require_turn(game: Game, player: Player) -> bool:
+    """Returns whether it's the player's turn, telling them off if it isn't."""
+    if game.order.get_current_player() is player:
+        return True
+    await player.send_error("It's not your turn.")
+    return False
+
+
+async def _handle_ready(game: Game, player: Player, data: dict) -> Optional[bool]:
+    game.set_ready(player, bool(data.get("is_ready", True)))
+    logger.debug("Player '%s' readiness changed to %s in game %s",
+                 player.name, player.is_ready, game.code)
+
+    # Check if all players are ready to start; this doesn't wait for the
+    # batched ready broadcast
+    if not game.started and len(game.players) > 1 and all(p.is_ready for p in game.players):
+        logger.info("All players are ready in game %s. Starting game.", game.code)
+        await game.start_game()
+
+
+async def _handle_move(game: Game, player: Player, data: dict) -> Optional[bool]:
+    if not game.started or not await _require_turn(game, player):
+        return
+
+    result = await game.process_move(player, data.get("move"))
+    if result and result.get("game_over"):
+        logger.info("Game %s ended. Winner: %s", game.code, result['winner_id'])
+        games.pop(game.code, None)
+        return True
+    elif player.card_count == 1:
+        await game.start_colo_challenge(
+            player=player,
+            broadcast_callback=game.broadcast
+        )
+
+
+async def _handle_draw_card(game: Game, player: Player, data: dict) -> Optional[bool]:
+    if not game.started or not await _require_turn(game, player):
+        return
+
+    await game.draw_card(player)
+
+
+async def _handle_colo(game: Game, player: Player, data: dict) -> Optional[bool]:
+    await game.colo_pressed(
+        player=player,
+        broadcast_callback=game.broadcast
+    )
+
+
+# Handlers for in-game messages, keyed by message type.
+# A handler returns True when the player's connection loop should end.
+_HANDLERS: Dict[str, Callable[[Game, Player, dict], Awaitable[Optional[bool]]]] = {
+    "ready": _handle_ready,
+    "move": _handle_move,
+    "draw_card": _handle_draw_card,
+    "colo": _handle_colo,
+}
+
+
 @app.websocket("/ws/game/{code}")
 async def game_ws(websocket: WebSocket, code: str):
     """
@@ -56,33 +172,33 @@ async def game_ws(websocket: WebSocket, code: str):
     game = games.get(code)
 
     if not game:
-        await websocket.send_json({"status": "error", "message": "Invalid game code"})
+        await send_json(websocket, {"status": "error", "message": "Invalid game code"})
         await websocket.close()
         return
 
     current_player: Union[Player, None] = None
     try:
         # 1. First message is for player registration
-        data = await websocket.receive_json()
-        player_name = data.get("name")
+        data = await recv_json(websocket)
+        player_name = data.get("name") if isinstance(data, dict) else None
 
-        if not player_name:
-            await websocket.send_json({"status": "error", "message": "Player name is required."})
+        if not player_name or not isinstance(player_name, str):
+            await send_json(websocket, {"status": "error", "message": "Player name is required."})
             return
 
         if game.is_full():
-            await websocket.send_json({"status": "error", "message": "This game is full."})
+            await send_json(websocket, {"status": "error", "message": "This game is full."})
             return
 
-        if any(p.name.lower() == player_name.lower() for p in game.players):
-            await websocket.send_json({"status": "error", "message": "This name is already taken."})
+        if game.is_name_taken(player_name):
+            await send_json(websocket, {"status": "error", "message": "This name is already taken."})
             return
 
         is_host = not game.players
         current_player = Player(
             name=player_name, websocket=websocket, is_host=is_host)
         game.add_player(current_player)
-        print(f"Player '{current_player.name}' joined game {code}")
+        logger.info("Player '%s' joined game %s", current_player.name, code)
 
         await game.broadcast({
             "status": "player_joined",
@@ -92,59 +208,18 @@ async def game_ws(websocket: WebSocket, code: str):
 
         # 2. Main game loop for handling player actions
         while True:
-            data = await websocket.receive_json()
-            message_type = data.get("type")
-
-            if message_type == "ready":
-                current_player.is_ready = data.get("is_ready", True)
-                print(
-                    f"Player '{current_player.name}' readiness changed to {current_player.is_ready} in game {code}")
-                await game.broadcast({
-                    "status": "player_ready",
-                    "player_id": current_player.id,
-                    "is_ready": current_player.is_ready,
-                })
-
-                # Check if all players are ready to start
-                if len(game.players) > 1 and all(p.is_ready for p in game.players):
-                    print(
-                        f"All players are ready in game {code}. Starting game.")
-                    await game.start_game()
-
-            elif message_type == "move" and game.started:
-                if game.order.get_current_player().id == current_player.id:
-                    result = await game.process_move(current_player, data.get("move"))
-                    if result and result.get("game_over"):
-                        print(
-                            f"Game {code} ended. Winner: {result['winner_id']}")
-                        del games[code]
-                        return
-                    elif len(current_player.hand) == 1:
-                        await game.start_colo_challenge(
-                            player=current_player,
-                            broadcast_callback=game.broadcast
-                        )
-                else:
-                    await websocket.send_json({"status": "error", "message": "It's not your turn."})
-
-            elif message_type == "draw_card" and game.started:
-                if game.order.get_current_player().id == current_player.id:
-                    await game.draw_card(current_player)
-                else:
-                    await websocket.send_json({"status": "error", "message": "It's not your turn."})
-
-            elif message_type == "colo":
-                await game.colo_pressed(
-                    caller=current_player,
-                    draw_card_callback=game.draw_card,
-                    broadcast_callback=game.broadcast
-                )
+            data = await recv_json(websocket)
+            message_type = data.get("type") if isinstance(data, dict) else None
+            # Only strings can be dict keys we know; anything else is ignored like an unknown type
+            handler = _HANDLERS.get(message_type) if isinstance(message_type, str) else None
+            if handler is not None and await handler(game, current_player, data):
+                return
 
     except WebSocketDisconnect:
-        print(
-            f"Player '{current_player.name if current_player else 'Unknown'}' disconnected from game {code}")
-    except Exception as e:
-        print(f"An unexpected error occurred in game {code}: {e}")
+        logger.info("Player '%s' disconnected from game %s",
+                    current_player.name if current_player else 'Unknown', code)
+    except Exception:
+        logger.exception("An unexpected error occurred in game %s", code)
     finally:
         # Cleanup on disconnect or error
         if current_player:
@@ -157,5 +232,5 @@ async def game_ws(websocket: WebSocket, code: str):
                 })
             else:
                 # If no players are left, remove the game from memory
-                del games[code]
-                print(f"Game {code} has been closed.")
+                games.pop(code, None)
+                logger.info("Game %s has been closed.", code)
@@ -1,29 +1,106 @@
-import uuid
-from typing import List, Dict
+import itertools
+from collections import Counter
+from typing import Dict, List
 from fastapi import WebSocket
 
+from ..lib.utils import Card, card_to_dict
+from ..lib.ws_json import send_json
+
+# Player ids only need to be unique within this process; they stay strings
+# because clients use them as JSON object keys
+_player_ids = itertools.count(1)
+
 
 class Player:
     """Represents a single player in a game."""
 
+    __slots__ = ("id", "name", "name_key", "websocket", "_is_host", "_is_ready",
+                 "_hand", "_card_count", "_cached_dict", "_dict_dirty")
+
     def __init__(self, name: str, websocket: WebSocket, is_host: bool = False):
-        self.id = str(uuid.uuid4())
+        self.id = str(next(_player_ids))
         self.name = name
+        self.name_key = name.casefold()  # For case-insensitive name comparisons
         self.websocket = websocket
-        self.is_host = is_host
-        self.is_ready = False
-        self.hand: List[Dict] = []
+        self._is_host = is_host
+        self._is_ready = False
+        self._hand: Counter[Card] = Counter()
+        self._card_count = 0
+
+        # to_dict() is rebuilt only after one of its fields changes
+        self._cached_dict: dict = {}
+        self._dict_dirty = True
+
+    @property
+    def is_host(self) -> bool:
+        return self._is_host
+
+    @is_host.setter
+    def is_host(self, value: bool):
+        self._is_host = value
+        self._dict_dirty = True
+
+    @property
+    def is_ready(self) -> bool:
+        return self._is_ready
+
+    @is_ready.setter
+    def is_ready(self, value: bool):
+        self._is_ready = value
+        self._dict_dirty = True
+
+    @property
+    def hand(self) -> Counter[Card]:
+        """The player's cards; change it through add_cards/remove_card so the count stays in sync."""
+        return self._hand
+
+    @hand.setter
+    def hand(self, cards: Counter[Card]):
+        self._hand = cards
+        self._card_count = cards.total()
+        self._dict_dirty = True
+
+    @property
+    def card_count(self) -> int:
+        return self._card_count
+
+    @property
+    def hand_dicts(self) -> List[Dict]:
+        """Returns the hand in the serializable form sent to clients."""
+        return [card_to_dict(card) for card in self._hand.elements()]
+
+    def has_card(self, card: Card) -> bool:
+        return self._hand[card] > 0
+
+    def add_cards(self, cards: List[Card]):
+        self._hand.update(cards)
+        self._card_count += len(cards)
+        self._dict_dirty = True
+
+    def remove_card(self, card: Card):
+        """Removes a single copy of a card, dropping the entry once none remain."""
+        self._hand[card] -= 1
+        if self._hand[card] <= 0:
+            del self._hand[card]
+        self._card_count -= 1
+        self._dict_dirty = True
 
     def to_dict(self) -> dict:
-        """Returns a serializable dictionary representation of the player."""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "is_host": self.is_host,
-            "is_ready": self.is_ready,
-            "card_count": len(self.hand)
-        }
+        """
+        Returns a serializable dictionary representation of the player.
+        The dict is cached and shared between calls, so callers must not modify it.
+        """
+        if self._dict_dirty:
+            self._cached_dict = {
+                "id": self.id,
+                "name": self.name,
+                "is_host": self._is_host,
+                "is_ready": self._is_ready,
+                "card_count": self._card_count
+            }
+            self._dict_dirty = False
+        return self._cached_dict
 
     async def send_error(self, message: str):
         """Sends a standardized error message to this player."""
-        await self.websocket.send_json({"status": "error", "message": message})
+        await send_json(self.websocket, {"status": "error", "message": message})
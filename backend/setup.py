@@ -0,0 +1,21 @@
+"""
+Compiles the hot, non-async modules into C extensions with mypyc:
+
+    pip install "mypy==1.16.0" setuptools
+    python setup.py build_ext --inplace
+
+The compiled modules are picked up in place of the .py files; without
+them the app runs as plain Python.
+"""
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="colo-backend",
+    packages=[],
+    ext_modules=mypycify([
+        "--explicit-package-bases",
+        "app/lib/utils.py",
+        "app/models/player.py",
+    ]),
+)